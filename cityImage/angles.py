@@ -214,36 +214,36 @@ def is_parallel(line_geometry_A, line_geometry_B, hard = False):
        
     if not hard:
         # remove first coordinates (A,B)
-        line_geometry_A = LineString([coor for coor in line_coordsA[1:]])
-        line_geometry_B = LineString([coor for coor in line_coordsB[1:]])
+        line_geometry_A = LineString(line_coordsA[1:])
+        line_geometry_B = LineString(line_coordsB[1:])
         difference_angle = difference_angle_line_geometries(line_geometry_A, line_geometry_B)
         if (difference_angle <= 20) & (difference_angle >= -20): 
             return True
         
         # remove first (A) and last (B)
-        line_geometry_B = LineString([coor for coor in line_coordsB[:-1]])
+        line_geometry_B = LineString(line_coordsB[:-1])
         difference_angle = difference_angle_line_geometries(line_geometry_A, line_geometry_B)
         if (difference_angle <= 20) & (difference_angle >= -20): 
             return True
         
         # remove last (A) and first (B)
-        line_geometry_A = LineString([coor for coor in line_coordsA[:-1]])
-        line_geometry_B = LineString([coor for coor in line_coordsB[1:]])
+        line_geometry_A = LineString(line_coordsA[:-1])
+        line_geometry_B = LineString(line_coordsB[1:])
         difference_angle = difference_angle_line_geometries(line_geometry_A, line_geometry_B)
         if (difference_angle <= 20) & (difference_angle >= -20): 
             return True
         
         # remove last coordinates (A, B)
-        line_geometry_A = LineString([coor for coor in line_coordsA[:-1]])
-        line_geometry_B = LineString([coor for coor in line_coordsB[:-1]])
+        line_geometry_A = LineString(line_coordsA[:-1])
+        line_geometry_B = LineString(line_coordsB[:-1])
         difference_angle = difference_angle_line_geometries(line_geometry_A, line_geometry_B)
         if (difference_angle <= 20) & (difference_angle >= -20): 
             return True
         
         if ((len(line_coordsA) == 3) | (len(line_coordsB) == 3)):
             return False
-        line_geometry_A = LineString([coor for coor in line_coordsA[1:-1]])
-        line_geometry_B = LineString([coor for coor in line_coordsB[1:-1]])
+        line_geometry_A = LineString(line_coordsA[1:-1])
+        line_geometry_B = LineString(line_coordsB[1:-1])
         difference_angle = difference_angle_line_geometries(line_geometry_A, line_geometry_B)
         if (difference_angle <= 20) & (difference_angle >= -20): 
             return True
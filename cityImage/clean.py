@@ -223,7 +223,7 @@ def simplify_graph(nodes_gdf, edges_gdf):
         
         # obtaining coordinates-list in consistent order and merging
         new_line = line_coordsA + line_coordsB
-        merged_line = LineString([coor for coor in new_line]) 
+        merged_line = LineString(new_line) 
         edges_gdf.at[index_first, 'geometry'] = merged_line
         
         if 'highway' in edges_gdf.columns: #type of street 
@@ -521,7 +521,7 @@ def _split_line_at_MultiPoint(line_geometry, intersection):
             if ((point.intersects(line)) | (line.distance(point) < 1e-8)):
                 new_line_coords.insert(n, point.coords[0])
                 break
-        line_geometry = LineString([coor for coor in new_line_coords])
+        line_geometry = LineString(new_line_coords)
                      
     lines = split(line_geometry, intersection)   
     return lines
@@ -575,6 +575,6 @@ def _update_line_geometry_coords(u, v, nodes_gdf, line_geometry):
     line_coords = list(line_geometry.coords)
     line_coords[0] = (nodes_gdf.loc[u]['x'], nodes_gdf.loc[u]['y'])
     line_coords[-1] = (nodes_gdf.loc[v]['x'], nodes_gdf.loc[v]['y'])
-    new_line_geometry = LineString([coor for coor in line_coords])
+    new_line_geometry = LineString(line_coords)
     
     return new_line_geometry
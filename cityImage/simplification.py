@@ -32,36 +32,36 @@ def is_parallel(line_geometry_A, line_geometry_B, hard = False):
        
     if not hard:
         # remove first coordinates (A,B)
-        line_geometry_A = LineString([coor for coor in line_coordsA[1:]])
-        line_geometry_B = LineString([coor for coor in line_coordsB[1:]])
+        line_geometry_A = LineString(line_coordsA[1:])
+        line_geometry_B = LineString(line_coordsB[1:])
         difference_angle = difference_angle_line_geometries(line_geometry_A, line_geometry_B)
         if (difference_angle <= 20) & (difference_angle >= -20): 
             return True
         
         # remove first (A) and last (B)
-        line_geometry_B = LineString([coor for coor in line_coordsB[:-1]])
+        line_geometry_B = LineString(line_coordsB[:-1])
         difference_angle = difference_angle_line_geometries(line_geometry_A, line_geometry_B)
         if (difference_angle <= 20) & (difference_angle >= -20): 
             return True
         
         # remove last (A) and first (B)
-        line_geometry_A = LineString([coor for coor in line_coordsA[:-1]])
-        line_geometry_B = LineString([coor for coor in line_coordsB[1:]])
+        line_geometry_A = LineString(line_coordsA[:-1])
+        line_geometry_B = LineString(line_coordsB[1:])
         difference_angle = difference_angle_line_geometries(line_geometry_A, line_geometry_B)
         if (difference_angle <= 20) & (difference_angle >= -20): 
             return True
         
         # remove last coordinates (A, B)
-        line_geometry_A = LineString([coor for coor in line_coordsA[:-1]])
-        line_geometry_B = LineString([coor for coor in line_coordsB[:-1]])
+        line_geometry_A = LineString(line_coordsA[:-1])
+        line_geometry_B = LineString(line_coordsB[:-1])
         difference_angle = difference_angle_line_geometries(line_geometry_A, line_geometry_B)
         if (difference_angle <= 20) & (difference_angle >= -20): 
             return True
         
         if ((len(line_coordsA) == 3) | (len(line_coordsB) == 3)):
             return False
-        line_geometry_A = LineString([coor for coor in line_coordsA[1:-1]])
-        line_geometry_B = LineString([coor for coor in line_coordsB[1:-1]])
+        line_geometry_A = LineString(line_coordsA[1:-1])
+        line_geometry_B = LineString(line_coordsB[1:-1])
         difference_angle = difference_angle_line_geometries(line_geometry_A, line_geometry_B)
         if (difference_angle <= 20) & (difference_angle >= -20): 
             return True
@@ -375,8 +375,8 @@ def simplify_complex_junctions(nodes_gdf, edges_gdf):
                     nodes_gdf.at[ix_node, 'geometry'] = Point(last)
                     edges_gdf.at[row.Index,'geometry'] = cl
 
-                    line_geometry_A = LineString([coor for coor in [connector_geometry.coords[0], last]])
-                    line_geometry_B = LineString([coor for coor in [last, connector_geometry.coords[-1]]])
+                    line_geometry_A = LineString([connector_geometry.coords[0], last])
+                    line_geometry_B = LineString([last, connector_geometry.coords[-1]])
                     edges_gdf.at[connector.name, 'geometry'] = line_geometry_A
                     edges_gdf.at[ix_edge, 'geometry'] = line_geometry_B
                     edges_gdf.at[connector.name, 'v'] = ix_node
@@ -753,7 +753,7 @@ def indirect_cluster(nodes_gdf, edges_gdf, clusters_gdf, ix_line, search_dir, sp
                         tmp.reverse()
                         line_coords = line_coords + tmp
                     break    
-    merged_line = LineString([coor for coor in line_coords])  
+    merged_line = LineString(line_coords)  
     if ((len(clusters_traversed) == 0) & (specific_cluster)):
         for n in nodes_traversed:
             if nodes_gdf.loc[n].cluster is not None:
@@ -786,13 +786,13 @@ def center_line_cluster(line_geometries, nodes_gdf, clusters_gdf, cluster_from,
     
     new_line = line_coordsA
     for n, i in enumerate(line_coordsA):
-        link = LineString([coor for coor in [line_coordsA[n], line_coordsB[n]]])
+        link = LineString([line_coordsA[n], line_coordsB[n]])
         np = link.centroid.coords[0]           
         new_line[n] = np
         
     new_line[0] = coord_from
     new_line[-1] = coord_to
-    center_line = LineString([coor for coor in new_line])           
+    center_line = LineString(new_line)           
         
     return center_line
 
@@ -809,8 +809,8 @@ def split_line_at_interpolation(point, line_geometry): #ok
     if len(line_coords) == 2:
         new_line_A = [line_coords[0],  np.coords[0]]
         new_line_B = [np.coords[0], line_coords[-1]]
-        line_geometry_A = LineString([coor for coor in new_line_A])
-        line_geometry_B = LineString([coor for coor in new_line_B])
+        line_geometry_A = LineString(new_line_A)
+        line_geometry_B = LineString(new_line_B)
 
     else:
         new_line_A.append(line_coords[0])
@@ -825,8 +825,8 @@ def split_line_at_interpolation(point, line_geometry): #ok
 
         new_line_A.append(np.coords[0])
         new_line_B.append(line_coords[-1])
-        line_geometry_A = LineString([coor for coor in new_line_A])
-        line_geometry_B = LineString([coor for coor in new_line_B])
+        line_geometry_A = LineString(new_line_A)
+        line_geometry_B = LineString(new_line_B)
     
     return((line_geometry_A, line_geometry_B), np)
                                                                                                        
@@ -877,7 +877,7 @@ def interpolate_on_centre_line(ix_line, center_line, nodes_gdf, edges_gdf,  firs
             # tmp_line_coords = list(row['geometry'].coords)
             # if row['u'] == node: tmp_line_coords.insert(1,nodes_gdf.loc[node]['geometry'].coords[0]) 
             # if row['v'] == node: tmp_line_coords.insert(-1,nodes_gdf.loc[node]['geometry'].coords[0]) 
-            # edges_gdf.at[ix, 'geometry'] = LineString([coor for coor in tmp_line_coords])
+            # edges_gdf.at[ix, 'geometry'] = LineString(tmp_line_coords)
         
         if counter == 0: 
             edges_gdf.at[new_index, 'u'] = first_node
@@ -934,7 +934,7 @@ def dissolve_dual_lines(ix_lines, line_geometries, nodes_gdf, edges_gdf, cluster
     if (direction == 'u') & (not interpolation):
         line_coords = list(cl.coords)
         line_coords.reverse() 
-        cl = LineString([coor for coor in line_coords])
+        cl = LineString(line_coords)
     
     if interpolation:
         interpolate_on_centre_line(ix_lineA, cl, nodes_gdf, edges_gdf, first_node, last_node, nodes_traversed, clusters_gdf, clusters_traversed)
@@ -1025,7 +1025,7 @@ def dissolve_multiple_dual_lines(ix_lines, line_geometries, nodes_gdf, edges_gdf
     if (direction == 'u') & (not interpolation):
         line_coords = list(cl.coords)
         line_coords.reverse() 
-        cl = LineString([coor for coor in line_coords])
+        cl = LineString(line_coords)
 
     if interpolation:
         interpolate_on_centre_line(ix_lines[0], cl, nodes_gdf, edges_gdf, first_node, last_node, nodes_traversed, clusters_gdf, clusters_traversed) 
@@ -1110,7 +1110,7 @@ def simplify_dual_lines(nodes_gdf, edges_gdf, clusters_gdf):
                 if candidate[ix_clus_v] == cluster:
                     line_coords = list(candidate[ix_geo].coords)
                     line_coords.reverse() 
-                    new_line_geometry = LineString([coor for coor in line_coords])
+                    new_line_geometry = LineString(line_coords)
                     old_u = candidate[ix_u]
                     old_clus_u, old_clus_uR = candidate[ix_clus_u], candidate[ix_clus_uR]
                     
@@ -1336,7 +1336,7 @@ def simplify_dual_lines_nodes_to_cluster(nodes_gdf, edges_gdf, clusters_gdf):
                 if candidate[ix_v] == node[0]:
                     line_coords = list(candidate[ix_geo].coords)
                     line_coords.reverse() 
-                    new_line_geometry = LineString([coor for coor in line_coords])
+                    new_line_geometry = LineString(line_coords)
                     old_u, old_clus_u, old_clus_uR = candidate[ix_u], candidate[ix_clus_u], candidate[ix_clus_uR]
                     possible_dual_lines.at[candidate[0],'geometry'] = new_line_geometry
                     possible_dual_lines.at[candidate[0],'u'] = candidate[ix_v]
@@ -1486,7 +1486,7 @@ def reassign_edges(nodes_gdf, edges_gdf, clusters_gdf):
                 line_coords[0] = (clusters_gdf.loc[u]['x'], clusters_gdf.loc[u]['y'])
                 # if not new_geo: line_coords.insert(1,nodes_gdf.loc[row[ix_old_u]]['geometry'].coords[0]) 
         
-        line_geometry = (LineString([coor for coor in line_coords]))
+        line_geometry = (LineString(line_coords))
         if u == v: 
             edges_gdf.drop(row.Index, axis = 0, inplace = True)
             continue
@@ -310,8 +310,8 @@ def simplify_complex_junctions(nodes_gdf, edges_gdf):
                     nodes_gdf.at[ix_node, 'geometry'] = Point(last)
                     edges_gdf.at[current_index,'geometry'] = cl
 
-                    line_geometry_A = LineString([coor for coor in [connector_geometry.coords[0], last]])
-                    line_geometry_B = LineString([coor for coor in [last, connector_geometry.coords[-1]]])
+                    line_geometry_A = LineString([connector_geometry.coords[0], last])
+                    line_geometry_B = LineString([last, connector_geometry.coords[-1]])
                     edges_gdf.at[connector.name, 'geometry'] = line_geometry_A
                     edges_gdf.at[ix_edge, 'geometry'] = line_geometry_B
                     edges_gdf.at[connector.name, 'v'] = ix_node
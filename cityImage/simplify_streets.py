@@ -1,15 +1,22 @@
-import warnings
-warnings.simplefilter(action='ignore')
-
+import os
+import functools
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 import geopandas as gpd
+import shapely
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 from shapely.geometry import Point, LineString, Polygon, MultiPoint
 from shapely.ops import linemerge, nearest_points, split, polygonize_full, unary_union
 
 pd.set_option("display.precision", 3)
 pd.options.mode.chained_assignment = None
 
+# Shapely >= 1.7.1 is required; with Shapely 2.0 the helpers below use its vectorized functions, instead of looping over the geometries
+_HAS_SHAPELY2 = int(shapely.__version__.split('.')[0]) >= 2
+
 from .graph import nodes_degree
 from .utilities import center_line, center_line_coords, merge_lines, split_line_at_interpolation
 from .clean import clean_network, correct_edges
@@ -42,52 +49,35 @@ def identify_clusters(nodes_gdf, edges_gdf, radius = 10):
     nodes_gdf, edges_gdf = nodes_gdf.copy(), edges_gdf.copy()
   
     to_ignore = {k: v for k, v in nodes_degree(edges_gdf).items() if v == 1}
-    tmp_nodes_gdf = nodes_gdf[~nodes_gdf.nodeID.isin(list(to_ignore.keys()))].copy() #ignoring dead-ends
-    buffered_nodes = tmp_nodes_gdf.buffer(radius).unary_union
-    if isinstance(buffered_nodes, Polygon): 
-        buffered_nodes = [buffered_nodes]
-        
-    buffered_nodes_geoS = gpd.GeoSeries(list(buffered_nodes))
-    buffered_nodes_df =  pd.concat([buffered_nodes_geoS.rename('geometry'), pd.Series(buffered_nodes_geoS.index).rename('clusterID')], axis=1)
-
-    buffered_nodes_gdf = gpd.GeoDataFrame(buffered_nodes_df, geometry = buffered_nodes_df.geometry)
-    buffered_nodes_gdf['area']= buffered_nodes_gdf['geometry'].area
-    buffered_nodes_gdf['centroid'] = buffered_nodes_gdf.geometry.centroid
+    tmp_nodes_gdf = nodes_gdf[~nodes_gdf.nodeID.isin(list(to_ignore.keys()))] #ignoring dead-ends
     
-    clusters_gdf = buffered_nodes_gdf[buffered_nodes_gdf["area"] > (radius*radius*3.14159)]
-    clusters_gdf['x'], clusters_gdf['y'] = (clusters_gdf.geometry.centroid.x, clusters_gdf.geometry.centroid.y)
-    clusters_gdf.index += nodes_gdf.index.max()+1
-    clusters_gdf['clusterID'] = clusters_gdf.index
+    # nodes whose buffers intersect, directly or through other nodes, form a cluster
+    buffered_nodes = tmp_nodes_gdf.buffer(radius)
+    # the Shapely 2.0 based index takes arrays in query (query_bulk is removed in geopandas 1.0); with Shapely 1.7 only query_bulk does
+    if _HAS_SHAPELY2:
+        ix_nodes, ix_other_nodes = buffered_nodes.sindex.query(buffered_nodes, predicate = 'intersects')
+    else:
+        ix_nodes, ix_other_nodes = buffered_nodes.sindex.query_bulk(buffered_nodes, predicate = 'intersects')
+    adjacency = coo_matrix((np.ones(len(ix_nodes)), (ix_nodes, ix_other_nodes)), shape = (len(tmp_nodes_gdf), len(tmp_nodes_gdf)))
+    _, labels = connected_components(adjacency, directed = False)
+    counts = np.bincount(labels)
+    
+    # the centroid of a cluster is the mean of its nodes' coordinates
+    clustered = np.flatnonzero(counts > 1)
+    x = np.bincount(labels, weights = tmp_nodes_gdf.geometry.x.values)[clustered]/counts[clustered]
+    y = np.bincount(labels, weights = tmp_nodes_gdf.geometry.y.values)[clustered]/counts[clustered]
+    clusterIDs = np.arange(len(clustered)) + nodes_gdf.index.max()+1
+    clusters_gdf = gpd.GeoDataFrame({'clusterID': clusterIDs, 'x': x, 'y': y, 'degree': counts[clustered]}, index = clusterIDs, 
+                                    crs = nodes_gdf.crs, geometry = gpd.points_from_xy(x, y))
     
     # set cluster column values
-    nodes_gdf["cluster"] = None
-    nodes_gdf["cluster"] = nodes_gdf.apply(lambda row: _assign_cluster_nodes(row["geometry"], clusters_gdf), axis = 1)
-    nodes_gdf = nodes_gdf.where(pd.notnull(nodes_gdf), None)
-    nodes_gdf.loc[nodes_gdf.nodeID.isin(list(to_ignore.keys())), "cluster"] = None
-    
-    clusters_counts = dict(nodes_gdf['cluster'].value_counts())
-    clusters_gdf['degree'] = 0
-    clusters_gdf['degree'] = clusters_gdf['clusterID'].map(clusters_counts)
-    
-    geometry = clusters_gdf['centroid']
-    data = clusters_gdf.drop(['centroid', 'geometry'], axis=1)
-    clusters_gdf = gpd.GeoDataFrame(data, crs= nodes_gdf.crs, geometry=geometry)
+    nodes_clusters = pd.Series(clusterIDs, index = clustered).reindex(labels)
+    nodes_gdf["cluster"] = pd.Series(nodes_clusters.values, index = tmp_nodes_gdf.index).astype('Int64')
+    
     edges_gdf = _assign_cluster_edges(nodes_gdf, edges_gdf, clusters_gdf)
     
     return(nodes_gdf, edges_gdf, clusters_gdf)
  
-def _assign_cluster_nodes(node_geometry, clusters_gdf): #ok
-        
-    ix_geo = clusters_gdf.columns.get_loc("geometry")+1
-    ix_cluster = clusters_gdf.columns.get_loc("clusterID")+1
-    
-    tmp = clusters_gdf[clusters_gdf["geometry"].intersects(node_geometry.buffer(1))]
-    if len(tmp) == 0: 
-        return None
-    for cluster in tmp.itertuples():
-        if node_geometry.within(cluster[ix_geo]): 
-            return int(cluster[ix_cluster])
-
 def _assign_cluster_edges(nodes_gdf, edges_gdf, clusters_gdf):
     
     nodes_gdf.set_index('nodeID', drop = False, append = False, inplace = True)
@@ -102,43 +92,51 @@ def _assign_cluster_edges(nodes_gdf, edges_gdf, clusters_gdf):
     edges_gdf.index.name = None
 
     edges_gdf['clus_uR'], edges_gdf['clus_vR'] = None, None
-    ix_clus_u, ix_clus_v  = edges_gdf.columns.get_loc("clus_u")+1, edges_gdf.columns.get_loc("clus_v")+1
-    ix_clus_uR, ix_clus_vR = edges_gdf.columns.get_loc("clus_uR")+1, edges_gdf.columns.get_loc("clus_vR")+1
+    # first and last vertexes, used to compute deflection angles when walking along the edges (rounded as in angle_line_geometries)
+    round_coords = np.vectorize(lambda coord: float("{0:.10f}".format(coord)), otypes = [float])
+    start, end = [round_coords(coords) for coords in _lines_endpoints(edges_gdf.geometry)]
+    edges_gdf['x_start'], edges_gdf['y_start'], edges_gdf['x_end'], edges_gdf['y_end'] = start[:, 0], start[:, 1], end[:, 0], end[:, 1]
    
     # assigning cluster
-    tmp = edges_gdf[(edges_gdf['clus_u'].isnull())].copy()
-    edges_gdf['clus_uR'] = tmp.apply(lambda row: indirect_cluster(nodes_gdf, edges_gdf, clusters_gdf, row['edgeID'],
-                                            'u')[0], axis = 1)
-    tmp = edges_gdf[(edges_gdf['clus_v'].isnull())].copy()
-    edges_gdf['clus_vR'] = tmp.apply(lambda row: indirect_cluster(nodes_gdf, edges_gdf, clusters_gdf, row['edgeID'],
-                                            'v')[0], axis = 1)
-    edges_gdf = edges_gdf.where(pd.notnull(edges_gdf), None)
+    # only edges not directly reaching a cluster need to be walked
+    incidence = _incident_edges(edges_gdf)
+    to_search = edges_gdf.index[edges_gdf['clus_u'].isnull()]
+    if len(to_search) > 0:
+        edges_gdf.loc[to_search, 'clus_uR'] = [indirect_cluster(nodes_gdf, edges_gdf, clusters_gdf, ix_line, 'u', incidence = incidence)[0] 
+                                                for ix_line in to_search]
+    to_search = edges_gdf.index[edges_gdf['clus_v'].isnull()]
+    if len(to_search) > 0:
+        edges_gdf.loc[to_search, 'clus_vR'] = [indirect_cluster(nodes_gdf, edges_gdf, clusters_gdf, ix_line, 'v', incidence = incidence)[0] 
+                                                for ix_line in to_search]
+    # missing clusters are represented by pd.NA (nullable integers)
+    for column in ['clus_u', 'clus_v', 'clus_uR', 'clus_vR']:
+        edges_gdf[column] = edges_gdf[column].astype('Int64')
     edges_gdf.drop(['nodeID_x', 'nodeID_y'], axis = 1, inplace = True, errors = 'ignore')       
     return(edges_gdf)
    
-def indirect_cluster(nodes_gdf, edges_gdf, clusters_gdf, ix_line, search_dir, specific_cluster = False, desired_cluster = None):
-    
-    ix_geo = edges_gdf.columns.get_loc("geometry")+1
-    ix_name = edges_gdf.columns.get_loc("name")+1
-    ix_u, ix_v = edges_gdf.columns.get_loc("u")+1, edges_gdf.columns.get_loc("v")+1
+def indirect_cluster(nodes_gdf, edges_gdf, clusters_gdf, ix_line, search_dir, specific_cluster = False, desired_cluster = None, incidence = None):
     
+    if incidence is None:
+        incidence = _incident_edges(edges_gdf)
     u, v = edges_gdf.loc[ix_line]['u'], edges_gdf.loc[ix_line]['v']
     line = edges_gdf.loc[ix_line].geometry
     name = edges_gdf.loc[ix_line]['name']
-    line_coords = list(line.coords)
+    # coordinates of the traversed lines are collected piece by piece and joined once the walk ends
+    line_coords = [np.asarray(line.coords)]
     
     if search_dir == 'v': 
         coming_from = v
         other_node = u
-        possible_matches = edges_gdf[(edges_gdf.u == v) | (edges_gdf.v == v)].copy()
+        possible_matches = edges_gdf.loc[incidence[v]]
     else: 
-        line_coords.reverse()
+        line_coords[0] = line_coords[0][::-1]
         coming_from = u
         other_node = v
-        possible_matches = edges_gdf[(edges_gdf.u == u) | (edges_gdf.v == u)].copy()
+        possible_matches = edges_gdf.loc[incidence[u]]
      
     possible_matches.drop(ix_line, axis = 0, inplace = True)
     nodes_traversed = []
+    nodes_traversed_set = set() # for membership checks, the list keeps the order
     lines_traversed = []
     clusters_traversed = []
     last_line = ix_line
@@ -146,90 +144,94 @@ def indirect_cluster(nodes_gdf, edges_gdf, clusters_gdf, ix_line, search_dir, sp
     found = False
     distance_start = 0.0
 
+    # distances are computed from the nodes' coordinates
+    nodes_x, nodes_y = nodes_gdf['x'], nodes_gdf['y']
+    other_node_xy = (nodes_x[other_node], nodes_y[other_node])
     if specific_cluster:
-        cluster_geometry = clusters_gdf.loc[desired_cluster].geometry
-        distance_start = cluster_geometry.distance(nodes_gdf.loc[coming_from].geometry)
+        cluster_xy = (clusters_gdf.at[desired_cluster, 'x'], clusters_gdf.at[desired_cluster, 'y'])
+        distance_start = _endpoint_dist(cluster_xy, (nodes_x[coming_from], nodes_y[coming_from]))
     
     while not found:
         if len(possible_matches) == 0: 
             return(None, None, None, None, None, None)
         if specific_cluster:
-            if cluster_geometry.distance(nodes_gdf.loc[coming_from].geometry) > distance_start:
+            if _endpoint_dist(cluster_xy, (nodes_x[coming_from], nodes_y[coming_from])) > distance_start:
                 return(None, None, None, None, None, None)
 
         possible_matches.drop(last_line, axis = 0, errors = "ignore", inplace = True)
         if len(possible_matches) > 0:
-            possible_matches['angle'] = 0.0
-            for connector in possible_matches.itertuples():
-                angle = angle_line_geometries(edges_gdf.loc[last_line].geometry, connector[ix_geo], deflection = True, degree = True)
-                possible_matches.at[connector.Index, 'angle'] = angle
-            
-            possible_matches.sort_values(by = 'angle', ascending = True, inplace = True)   
+            line_start = edges_gdf.loc[last_line, ['x_start', 'y_start']].values.astype(float)
+            line_end = edges_gdf.loc[last_line, ['x_end', 'y_end']].values.astype(float)
+            angles = _deflection_angles(line_start, line_end, possible_matches[['x_start', 'y_start']].values.astype(float),
+                                        possible_matches[['x_end', 'y_end']].values.astype(float))
+            possible_matches = possible_matches.iloc[np.argsort(angles)]
             
         if len(possible_matches) == 0: 
-            return(None, None, None, None, None, None)    
-        for connector in possible_matches.itertuples():
-            if not is_continuation(last_line, connector.Index, edges_gdf):
-                possible_matches.drop(connector.Index, axis = 0, inplace = True)
+            return(None, None, None, None, None, None)
+        connectors = zip(possible_matches.index.to_numpy(), possible_matches.u.to_numpy(), possible_matches.v.to_numpy(), 
+                        possible_matches.geometry.to_numpy())
+        for ix_connector, uCP, vCP, connector_geometry in connectors:
+            if not is_continuation(last_line, ix_connector, edges_gdf):
                 continue
             
             else:
-                uCP, vCP = connector[ix_u], connector[ix_v]
-                
                 if uCP == coming_from:
-                    cluster = nodes_gdf.loc[vCP].cluster
+                    cluster = nodes_gdf.at[vCP, 'cluster']
                     coming_from = vCP
-                    distance_to = nodes_gdf.loc[vCP].geometry.distance(nodes_gdf.loc[other_node].geometry)
-                    distance_from = nodes_gdf.loc[uCP].geometry.distance(nodes_gdf.loc[other_node].geometry)
-                    if (vCP in nodes_traversed) | (distance_to < distance_from):
+                    distance_to = _endpoint_dist((nodes_x[vCP], nodes_y[vCP]), other_node_xy)
+                    distance_from = _endpoint_dist((nodes_x[uCP], nodes_y[uCP]), other_node_xy)
+                    if (vCP in nodes_traversed_set) | (distance_to < distance_from):
                         possible_matches = possible_matches[0:0]
                         break
                 else: 
-                    cluster = nodes_gdf.loc[uCP].cluster
+                    cluster = nodes_gdf.at[uCP, 'cluster']
                     coming_from = uCP
-                    distance_to = nodes_gdf.loc[uCP].geometry.distance(nodes_gdf.loc[other_node].geometry)
-                    distance_from = nodes_gdf.loc[vCP].geometry.distance(nodes_gdf.loc[other_node].geometry)
-                    if (uCP in nodes_traversed) | (distance_to < distance_from):
+                    distance_to = _endpoint_dist((nodes_x[uCP], nodes_y[uCP]), other_node_xy)
+                    distance_from = _endpoint_dist((nodes_x[vCP], nodes_y[vCP]), other_node_xy)
+                    if (uCP in nodes_traversed_set) | (distance_to < distance_from):
                         possible_matches = possible_matches[0:0]
                         break
                                     
-                if (cluster is None) | ((specific_cluster) & (cluster != desired_cluster)):
-                    lines_traversed.append(connector.Index)
-                    last_line = connector.Index
+                if (pd.isna(cluster)) | ((specific_cluster) & (cluster != desired_cluster)):
+                    lines_traversed.append(ix_connector)
+                    last_line = ix_connector
 
                     if vCP == coming_from:
-                        possible_matches = edges_gdf[(edges_gdf.u == vCP) | (edges_gdf.v == vCP) ].copy()
-                        nodes_traversed.append(uCP) 
-                        line_coords = line_coords + list(connector[ix_geo].coords)
+                        possible_matches = edges_gdf.loc[incidence[vCP]]
+                        nodes_traversed.append(uCP)
+                        nodes_traversed_set.add(uCP)
+                        line_coords.append(np.asarray(connector_geometry.coords))
                     else:
-                        possible_matches = edges_gdf[(edges_gdf.u == uCP) | (edges_gdf.v == uCP)].copy()
+                        possible_matches = edges_gdf.loc[incidence[uCP]]
                         nodes_traversed.append(vCP)
-                        tmp = list(connector[ix_geo].coords)
-                        tmp.reverse()
-                        line_coords = line_coords + tmp
-                    if (specific_cluster) & (cluster is not None): 
+                        nodes_traversed_set.add(vCP)
+                        line_coords.append(np.asarray(connector_geometry.coords)[::-1])
+                    if (specific_cluster) & (pd.notna(cluster)): 
                         clusters_traversed.append(cluster)
                     break
                 
-                elif (cluster is not None) | ((specific_cluster) & (cluster == desired_cluster)):
+                elif (pd.notna(cluster)) | ((specific_cluster) & (cluster == desired_cluster)):
                     found = True
-                    lines_traversed.append(connector.Index)
+                    lines_traversed.append(ix_connector)
                     
                     if vCP == coming_from:
                         nodes_traversed.append(uCP)
+                        nodes_traversed_set.add(uCP)
                         last_node = vCP
-                        line_coords = line_coords + list(connector[ix_geo].coords)
+                        line_coords.append(np.asarray(connector_geometry.coords))
                     else: 
                         nodes_traversed.append(vCP)
+                        nodes_traversed_set.add(vCP)
                         last_node = uCP
-                        tmp = list(connector[ix_geo].coords)
-                        tmp.reverse()
-                        line_coords = line_coords + tmp
-                    break    
-    merged_line = LineString([coor for coor in line_coords])  
+                        line_coords.append(np.asarray(connector_geometry.coords)[::-1])
+                    break
+        else:
+            # none of the connectors continues the line
+            possible_matches = possible_matches[0:0]
+    merged_line = LineString(np.concatenate(line_coords))  
     if ((len(clusters_traversed) == 0) & (specific_cluster)):
         for n in nodes_traversed:
-            if nodes_gdf.loc[n].cluster is not None:
+            if pd.notna(nodes_gdf.loc[n].cluster):
                 clusters_traversed.append(nodes_gdf.loc[n].cluster)
             
     return(cluster, merged_line, lines_traversed, nodes_traversed, last_node, clusters_traversed)
@@ -271,7 +273,7 @@ def center_line_cluster(line_geometries, nodes_gdf, clusters_gdf, cluster_from,
         
     cl_coords[0] = coord_from
     cl_coords[-1] = coord_to
-    center_line = LineString([coor for coor in cl_coords])           
+    center_line = LineString(cl_coords)           
         
     return center_line        
                                                                                                                                                                                                                 
@@ -293,13 +295,9 @@ def dissolve_dual_lines(ix_lines, line_geometries, nodes_gdf, edges_gdf, cluster
         return None
     
     if not one_cluster:    
-        if (Point(line_geometry_A.coords[0]).distance(Point(line_geometry_A.coords[0])) >
-                    Point(line_geometry_A.coords[0]).distance(Point(line_geometry_B.coords[-1]))):
-            dist_SS = Point(line_geometry_A.coords[0]).distance(Point(line_geometry_B.coords[-1]))
-            dist_EE = Point(line_geometry_A.coords[-1]).distance(Point(line_geometry_B.coords[0]))
-        else:
-            dist_SS = Point(line_geometry_A.coords[0]).distance(Point(line_geometry_B.coords[0]))
-            dist_EE = Point(line_geometry_A.coords[-1]).distance(Point(line_geometry_B.coords[-1]))
+        start, end = _lines_endpoints(line_geometries[:2])
+        dist_SS = _endpoint_dist(start[0], start[1])
+        dist_EE = _endpoint_dist(end[0], end[1])
             
         if (dist_SS > dist_EE*1.50) | (dist_EE > dist_SS*1.50): 
             return None
@@ -312,9 +310,7 @@ def dissolve_dual_lines(ix_lines, line_geometries, nodes_gdf, edges_gdf, cluster
     if cl is None: 
         return None
     if (direction == 'u') & (not interpolation):
-        line_coords = list(cl.coords)
-        line_coords.reverse() 
-        cl = LineString([coor for coor in line_coords])
+        cl = _reverse_lines([cl])[0]
     if interpolation:
         interpolate_on_center_line(ix_lineA, cl, nodes_gdf, edges_gdf, first_node, last_node, nodes_traversed, clusters_gdf, clusters_traversed)
         return 'processed'
@@ -328,85 +324,35 @@ def dissolve_dual_lines(ix_lines, line_geometries, nodes_gdf, edges_gdf, cluster
 def dissolve_multiple_dual_lines(ix_lines, line_geometries, nodes_gdf, edges_gdf, clusters_gdf, cluster, goal, first_node, last_node, 
                                 nodes_traversed, direction, one_cluster = False, clusters_traversed = []):
       
-    dict_lines = dict(zip(ix_lines, line_geometries))
-    secondary_lines = []
-    max_dist = 0
-    
     interpolation = len(nodes_traversed) > 0
+    lengths = _lines_lengths(line_geometries)
+    if lengths.max() > lengths.min() * 1.50: 
+        return None     
     
-    for line in dict_lines.values():
-        for other_line in dict_lines.values():
-            if line == other_line: 
-                continue
-            if line.length > other_line.length * 1.50: 
-                return None     
-    
-    if (len(dict_lines)%2 == 0):
-        while len(dict_lines) > 2:
-            distances = {}
-            for key, line in dict_lines.items():
-                cumulative_distance = 0.0
-                for other_key, other_line in dict_lines.items():
-                    if key == other_key: 
-                        continue
-                    mid_point = line.interpolate(0.5, normalized = True)
-                    other_mid_point = other_line.interpolate(0.5, normalized = True)
-                    distance = mid_point.distance(other_mid_point)
-                    cumulative_distance += distance
-                    
-                mean_distance = cumulative_distance/len(dict_lines)
-                distances[key] = mean_distance
-            distances = {k: v for k, v in sorted(distances.items(), key=lambda item: item[1])}
-            to_remove = list(distances.keys())[-2:]
-            for key in to_remove: 
-                del dict_lines[key]
-            
-        line_geometries = list(dict_lines.values())
-        
+    # discarding, two at the time, the lines whose midpoints are on average the farthest from the others'
+    mid_points = _lines_midpoints(line_geometries)
+    to_keep = np.arange(len(line_geometries))
+    min_lines = 2 if (len(line_geometries)%2 == 0) else 3
+    while len(to_keep) > min_lines:
+        mean_distances = _distance_matrix(mid_points[to_keep]).sum(axis = 1)/len(to_keep)
+        to_keep = np.delete(to_keep, np.argsort(mean_distances, kind = 'stable')[-2:])
+    
+    if (len(line_geometries)%2 == 0):
+        line_geometries = [line_geometries[i] for i in to_keep]
         if one_cluster: 
             cl = center_line_cluster(line_geometries, nodes_gdf, clusters_gdf, first_node, goal, one_cluster = True)
         else: 
             cl = center_line_cluster(line_geometries, nodes_gdf, clusters_gdf, cluster, goal)
         
-    elif len(dict_lines)%2 != 0:   
-        
-        while len(dict_lines) > 3:
-            distances = {}
-            for key, line in dict_lines.items():
-                cumulative_distance = 0.0
-                for other_key, other_line in dict_lines.items():
-                    if key == other_key: 
-                        continue
-                    mid_point = line.interpolate(0.5, normalized = True)
-                    other_mid_point = other_line.interpolate(0.5, normalized = True)
-                    distance = mid_point.distance(other_mid_point)
-                    cumulative_distance += distance
-                    
-                mean_distance = cumulative_distance/len(dict_lines)
-                distances[key] = mean_distance
-            distances = {k: v for k, v in sorted(distances.items(), key=lambda item: item[1])}
-            to_remove = list(distances.keys())[-2:]
-            for key in to_remove: 
-                del dict_lines[key]
-
-        for key, line in dict_lines.items():
-            for other_key, other_line in dict_lines.items():
-                if key == other_key: 
-                    continue
-                mid_point = line.interpolate(0.5, normalized = True)
-                other_mid_point = other_line.interpolate(0.5, normalized = True)
-                distance = mid_point.distance(other_mid_point)
-                if distance > max_dist: 
-                    max_dist = distance
-                    secondary_lines = [key, other_key]
-
-        ix_central = [x for x in list(dict_lines.keys()) if x not in secondary_lines][0]
-        cl = dict_lines[ix_central]
+    else:   
+        # the central line is the one not involved in the farthest pair
+        distances = _distance_matrix(mid_points[to_keep])
+        secondary_lines = np.unravel_index(distances.argmax(), distances.shape) if distances.max() > 0.0 else []
+        ix_central = [n for n in range(len(to_keep)) if n not in secondary_lines][0]
+        cl = line_geometries[to_keep[ix_central]]
     
     if (direction == 'u') & (not interpolation):
-        line_coords = list(cl.coords)
-        line_coords.reverse() 
-        cl = LineString([coor for coor in line_coords])
+        cl = _reverse_lines([cl])[0]
 
     if interpolation:
         interpolate_on_center_line(ix_lines[0], cl, nodes_gdf, edges_gdf, first_node, last_node, nodes_traversed, clusters_gdf, clusters_traversed) 
@@ -441,89 +387,82 @@ def simplify_dual_lines(nodes_gdf, edges_gdf, clusters_gdf):
     nodes_gdf, edges_gdf, clusters_gdf = nodes_gdf.copy(), edges_gdf.copy(), clusters_gdf.copy()
     nodes_gdf, edges_gdf, clusters_gdf = _check_indexes(nodes_gdf, edges_gdf, clusters_gdf)
     
-    
-    ix_geo = edges_gdf.columns.get_loc("geometry")+1
-    ix_u, ix_v  = edges_gdf.columns.get_loc("u")+1, edges_gdf.columns.get_loc("v")+1
-    ix_name = edges_gdf.columns.get_loc("name")+1
-    ix_cluster = nodes_gdf.columns.get_loc("cluster")+1
-    ix_clus_u, ix_clus_v  = edges_gdf.columns.get_loc("clus_u")+1, edges_gdf.columns.get_loc("clus_v")+1
-    ix_clus_uR, ix_clus_vR = edges_gdf.columns.get_loc("clus_uR")+1, edges_gdf.columns.get_loc("clus_vR")+1
-    
     ################################ FROM NODES TO CLUSTERED JUNCTIONS
     
     clusters_gdf['keep'] = False
     edges_gdf['new_geo'] = False
     edges_gdf['forced_cluster'] = False
     original_nodes_gdf, original_edges_gdf, original_clusters_gdf = nodes_gdf.copy(), edges_gdf.copy(), clusters_gdf.copy()
-    processed = []
-    to_drop = []
     
+    original_incidence = _incident_edges(original_edges_gdf)
+    
+    # the original GeoDataFrames are not modified below, the same walks can therefore be reused across clusters
+    @functools.lru_cache(maxsize = None)
+    def _indirect_cluster(ix_line, search_dir, specific_cluster = False, desired_cluster = None):
+        return indirect_cluster(original_nodes_gdf, original_edges_gdf, original_clusters_gdf, ix_line, search_dir, 
+                                specific_cluster = specific_cluster, desired_cluster = desired_cluster, incidence = original_incidence)
+    processed = set()
+    to_drop = set()
+    kept = set()
+    pedestrian = set(original_edges_gdf.index[original_edges_gdf.pedestrian == 1])
+    pedestrian_lines = set()
+    # columns of the original edges as arrays, missing clusters as -1
+    edges_index, edges_u, edges_v = original_edges_gdf.index.values, original_edges_gdf.u.values, original_edges_gdf.v.values
+    edges_clus_u, edges_clus_v, edges_clus_uR, edges_clus_vR = [original_edges_gdf[column].to_numpy(dtype = 'int64', na_value = -1) 
+                                                                for column in ['clus_u', 'clus_v', 'clus_uR', 'clus_vR']]
     
     print('Simplifying dual lines: First part - clusters')
     clusters_gdf.sort_values(by = 'degree', ascending = False, inplace = True)
     list_cluster = clusters_gdf.index.values.tolist() 
+    # the edges directly reaching each cluster are looked up once
+    edges_by_cluster = _incident_edges(original_edges_gdf, 'clus_u', 'clus_v')
     
     for cluster in list_cluster:
-        edges_tmp = original_edges_gdf[((original_edges_gdf.clus_u == cluster) | (original_edges_gdf.clus_v == cluster))].copy()
-        edges_tmp = edges_tmp[edges_tmp.clus_u != edges_tmp.clus_v].copy()
-        edges_tmp.sort_values(by = 'length', ascending = False, inplace = True)
+        edges_tmp = original_edges_gdf.loc[edges_by_cluster[cluster]]
+        edges_tmp = edges_tmp[(edges_tmp.clus_u != edges_tmp.clus_v).fillna(True)].sort_values(by = 'length', ascending = False)
         if len(edges_tmp) == 1: 
             continue
 
-        for road in edges_tmp.itertuples():          
-            if road.Index in processed: 
+        for ix_road in edges_tmp.index:
+            if ix_road in processed: 
                 continue
-            possible_dual_lines = edges_tmp.copy() 
-            edges_gdf['forced_cluster'] = False
-            
             # disregard unparallel lines 
-            possible_dual_lines['candidate'] = True
-            possible_dual_lines['candidate'] = possible_dual_lines.apply(lambda r: is_possible_dual(road.Index, r['edgeID'], original_edges_gdf, 
-                                                        processed), axis = 1)
-            possible_dual_lines.at[road.Index, 'candidate' ] = True
-            possible_dual_lines = possible_dual_lines[possible_dual_lines.candidate]
+            candidates = _is_possible_dual_batch(ix_road, edges_tmp, processed)
+            candidates[edges_tmp.index.get_loc(ix_road)] = True
+            possible_dual_lines = edges_tmp[candidates]
             if len(possible_dual_lines) < 2: 
                 continue
             possible_dual_lines['dir'] = 'v'
 
             # orientate everything from "u" to "v" in relation to the cluster
-            for candidate in possible_dual_lines.itertuples():
-                if candidate[ix_clus_v] == cluster:
-                    line_coords = list(candidate[ix_geo].coords)
-                    line_coords.reverse() 
-                    new_line_geometry = LineString([coor for coor in line_coords])
-                    old_u = candidate[ix_u]
-                    old_clus_u, old_clus_uR = candidate[ix_clus_u], candidate[ix_clus_uR]
-                    
-                    possible_dual_lines.at[candidate.Index,'geometry'] = new_line_geometry
-                    possible_dual_lines.at[candidate.Index,'u']  = candidate[ix_v]
-                    possible_dual_lines.at[candidate.Index,'v'] = old_u
-                    possible_dual_lines.at[candidate.Index,'clus_u'] = candidate[ix_clus_v]
-                    possible_dual_lines.at[candidate.Index,'clus_v'] = old_clus_u
-                    possible_dual_lines.at[candidate.Index,'clus_uR'] = candidate[ix_clus_vR]
-                    possible_dual_lines.at[candidate.Index,'clus_vR'] = old_clus_uR
-                    possible_dual_lines.at[candidate.Index, 'dir'] = 'u' # indicates original dir
+            to_reverse = possible_dual_lines.index[_cluster_mask(possible_dual_lines, cluster, ['clus_v'])]
+            if len(to_reverse) > 0:
+                reversed_lines = possible_dual_lines.loc[to_reverse]
+                possible_dual_lines.loc[to_reverse, 'geometry'] = gpd.GeoSeries(_reverse_lines(reversed_lines.geometry), index = to_reverse)
+                for column, other_column in [('u', 'v'), ('clus_u', 'clus_v'), ('clus_uR', 'clus_vR')]:
+                    possible_dual_lines.loc[to_reverse, column] = reversed_lines[other_column].values
+                    possible_dual_lines.loc[to_reverse, other_column] = reversed_lines[column].values
+                possible_dual_lines.loc[to_reverse, 'dir'] = 'u' # indicates original dir
             
             # does the line considered in the loop reach a cluster? if not straight away, at some point?            
-            if possible_dual_lines.loc[road.Index]['clus_v'] is not None: 
-                goal = possible_dual_lines.loc[road.Index]['clus_v']
-            else: goal = possible_dual_lines.loc[road.Index]['clus_vR']
-            if (goal is None) | (goal == cluster): 
+            if pd.notna(possible_dual_lines.at[ix_road, 'clus_v']): 
+                goal = possible_dual_lines.at[ix_road, 'clus_v']
+            else: goal = possible_dual_lines.at[ix_road, 'clus_vR']
+            if (pd.isna(goal)) | (goal == cluster): 
                 continue
             
             for candidate in possible_dual_lines.itertuples():
                 
-                if candidate[ix_clus_v] is not None: 
-                    secondary_goal = candidate[ix_clus_v]
-                else: secondary_goal = candidate[ix_clus_vR]
-                if secondary_goal != goal: 
+                if pd.notna(candidate.clus_v): 
+                    secondary_goal = candidate.clus_v
+                else: secondary_goal = candidate.clus_vR
+                if (pd.isna(secondary_goal)) | (secondary_goal != goal): 
                     direction = possible_dual_lines.at[candidate.Index, 'dir']
-                    forced_cluster = indirect_cluster(original_nodes_gdf, original_edges_gdf, original_clusters_gdf, candidate.Index, direction, 
-                                specific_cluster = True, desired_cluster = goal)[0]     
+                    forced_cluster = _indirect_cluster(candidate.Index, direction, specific_cluster = True, desired_cluster = goal)[0]     
                     if forced_cluster == goal:
                         possible_dual_lines.at[candidate.Index, 'forced_cluster'] = True
                         possible_dual_lines.at[candidate.Index, 'clus_vR'] = forced_cluster
-                        possible_dual_lines.at[candidate.Index, 'clus_v'] = None
+                        possible_dual_lines.at[candidate.Index, 'clus_v'] = pd.NA
                     else: possible_dual_lines.drop(candidate.Index, axis = 0, inplace = True)
             
             done = False
@@ -532,14 +471,12 @@ def simplify_dual_lines(nodes_gdf, edges_gdf, clusters_gdf):
                 continue # no parallel streets to row.Index 
             
 
-            line_geometries = [possible_dual_lines.iloc[i]['geometry'] for i in range(0, len(possible_dual_lines))]       
-            ix_lines = [possible_dual_lines.iloc[i].edgeID for i in range(0, len(possible_dual_lines))]  
-            c_u = [possible_dual_lines.iloc[i]['clus_u'] for i in range(0, len(possible_dual_lines))]
-            c_v = [possible_dual_lines.iloc[i]['clus_v'] for i in range(0, len(possible_dual_lines))]
-            u =  [possible_dual_lines.iloc[i]['u'] for i in range(0, len(possible_dual_lines))] 
-            v =  [possible_dual_lines.iloc[i]['v'] for i in range(0, len(possible_dual_lines))]
-            forced_cluster =  [possible_dual_lines.iloc[i]['forced_cluster'] for i in range(0, len(possible_dual_lines))]
-            drs = [possible_dual_lines.iloc[i]['dir'] for i in range(0, len(possible_dual_lines))] 
+            line_geometries = list(possible_dual_lines['geometry'].values)
+            ix_lines = possible_dual_lines['edgeID'].tolist()
+            c_v = possible_dual_lines['clus_v'].tolist()
+            u = possible_dual_lines['u'].tolist()
+            forced_cluster = possible_dual_lines['forced_cluster'].tolist()
+            drs = possible_dual_lines['dir'].tolist()
             list_nodes_traversed = [[] for i in range(0, len(possible_dual_lines))]
             list_lines_traversed = [[] for i in range(0, len(possible_dual_lines))]
             list_clusters_traversed = [[] for i in range(0, len(possible_dual_lines))] 
@@ -548,7 +485,7 @@ def simplify_dual_lines(nodes_gdf, edges_gdf, clusters_gdf):
             ######################################################## 
             ## OPTION 1: they all reach another cluster:
 
-            if all(x == c_v[0] for x in c_v) & (not None in c_v):
+            if (not pd.isna(c_v).any()) and all(x == c_v[0] for x in c_v):
                 if len(possible_dual_lines) == 2:
                     merged = dissolve_dual_lines(ix_lines, line_geometries, nodes_gdf, edges_gdf, clusters_gdf, cluster, goal, u[0], last_node,
                                                         nodes_traversed, drs[0])
@@ -562,63 +499,41 @@ def simplify_dual_lines(nodes_gdf, edges_gdf, clusters_gdf):
             ######################################################## 
             ## OPTION 2: at least one does not reach the cluster:    
             
-            elif None in c_v:
+            elif pd.isna(c_v).any():
                 # pre-check 
                 if len(possible_dual_lines) > 2:
-                    all_checked = False
-                    
-                    while not all_checked:
-                        all_checked = True
-                        for n, line in enumerate(line_geometries):
-                            for nn, other_line in enumerate(line_geometries):
-                                if n >= nn : 
-                                    continue
-                                if ((line.coords[0] == other_line.coords[0]) | (line.coords[0] == other_line.coords[-1]) |
-                                    (line.coords[-1] == other_line.coords[0]) | (line.coords[-1] == other_line.coords[-1])):
-                                    if line.length > other_line.length: 
-                                        to_remove = n
-                                    elif line.length < other_line.length: 
-                                        to_remove = nn
-                                    else: continue
-                                    for ll in [c_u, c_v, u, v, drs, line_geometries, ix_lines, list_nodes_traversed, list_lines_traversed, 
-                                        list_clusters_traversed, forced_cluster]: 
-                                        del ll[to_remove]
-                                    all_checked = False
-                                    break
-                            if not all_checked: 
-                                break
+                    to_remove = _longer_coincident_lines(line_geometries)
+                    if len(to_remove) > 0:
+                        for ll in [c_v, u, drs, line_geometries, ix_lines, list_nodes_traversed, list_lines_traversed, 
+                            list_clusters_traversed, forced_cluster]: 
+                            ll[:] = [item for n, item in enumerate(ll) if n not in to_remove]
                             
                 if len(ix_lines) < 2: 
                     continue
                     
                 for n, c in enumerate(c_v):
                     specific_cluster, desired_cluster = False, None
-                    if c is None:
+                    if pd.isna(c):
                         if forced_cluster[n]:
                            specific_cluster = True
                            desired_cluster = goal
                            
-                        _, line_geometries[n], list_lines_traversed[n], list_nodes_traversed[n], last_node, list_clusters_traversed[n] = indirect_cluster(
-                                    original_nodes_gdf, original_edges_gdf, original_clusters_gdf, ix_lines[n], drs[n], specific_cluster = specific_cluster, 
-                                    desired_cluster = desired_cluster)
+                        _, line_geometries[n], list_lines_traversed[n], list_nodes_traversed[n], last_node, list_clusters_traversed[n] = _indirect_cluster(
+                                    ix_lines[n], drs[n], specific_cluster = specific_cluster, desired_cluster = desired_cluster)
                 
+                # a line whose walk shares lines with the walk of a previous (kept) line is discarded
                 if len(possible_dual_lines) > 2:
-                    all_checked = False
-                    
-                    while not all_checked:
-                        all_checked = True
-                        for n, i in enumerate(list_lines_traversed):
-                            for nn, ii in enumerate(list_lines_traversed):
-                                if n >= nn: 
-                                    continue 
-                                if len(list(set(i).intersection(ii))) > 0: 
-                                    for ll in [c_u, c_v, u, v, drs, line_geometries, ix_lines, list_nodes_traversed, list_lines_traversed,
-                                                list_clusters_traversed, forced_cluster]: 
-                                        del ll[nn]
-                                    all_checked = False
-                                    break
-                            if not all_checked: 
-                                break
+                    seen, to_remove = set(), set()
+                    for n, lines in enumerate(list_lines_traversed):
+                        lines = set(lines)
+                        if lines & seen: 
+                            to_remove.add(n)
+                        else: 
+                            seen |= lines
+                    if len(to_remove) > 0:
+                        for ll in [c_v, u, drs, line_geometries, ix_lines, list_nodes_traversed, list_lines_traversed,
+                                    list_clusters_traversed, forced_cluster]: 
+                            ll[:] = [item for n, item in enumerate(ll) if n not in to_remove]
 
                 if len(ix_lines) < 2: 
                     continue
@@ -629,12 +544,11 @@ def simplify_dual_lines(nodes_gdf, edges_gdf, clusters_gdf):
                 clusters_traversed = [item for items in list_clusters_traversed for item in items if item is not None]
                 
                 if len(possible_dual_lines) == 2:
-                    common = list(set(list_lines_traversed[0]).intersection(list_lines_traversed[1]))
-                    if len(common) > 0:
+                    # a pair of lines whose walks share lines is not a dual line
+                    if not set(list_lines_traversed[0]).isdisjoint(list_lines_traversed[1]):
                         continue
-                    else: 
-                        merged = dissolve_dual_lines(ix_lines, line_geometries, nodes_gdf, edges_gdf, clusters_gdf, cluster, goal, u[0], last_node, 
-                                                    nodes_traversed, drs[0], clusters_traversed = clusters_traversed)
+                    merged = dissolve_dual_lines(ix_lines, line_geometries, nodes_gdf, edges_gdf, clusters_gdf, cluster, goal, u[0], last_node, 
+                                                nodes_traversed, drs[0], clusters_traversed = clusters_traversed)
                 else:
                     merged = dissolve_multiple_dual_lines(ix_lines, line_geometries, nodes_gdf, edges_gdf, clusters_gdf, cluster, goal, u[0], last_node,
                                                 nodes_traversed, drs[0], clusters_traversed = clusters_traversed)
@@ -647,23 +561,26 @@ def simplify_dual_lines(nodes_gdf, edges_gdf, clusters_gdf):
                 pass 
             else:  
                 clusters = [cluster, goal]
-                between = (
-                        list(original_edges_gdf.index[(original_edges_gdf.u.isin(nodes_traversed)) & (original_edges_gdf.v.isin(nodes_traversed))])+
-                        list(original_edges_gdf.index[(original_edges_gdf.clus_u.isin(clusters)) & (original_edges_gdf.v.isin(nodes_traversed))])+
-                        list(original_edges_gdf.index[(original_edges_gdf.clus_v.isin(clusters)) & (original_edges_gdf.u.isin(nodes_traversed))])+ 
-                        list(original_edges_gdf.index[(original_edges_gdf.clus_uR.isin(clusters)) & (original_edges_gdf.v.isin(nodes_traversed))])+
-                        list(original_edges_gdf.index[(original_edges_gdf.clus_vR.isin(clusters)) & (original_edges_gdf.u.isin(nodes_traversed))]))
-                
+                # edges between traversed nodes, or between a traversed node and one of the clusters
+                candidates = _incident_positions(original_edges_gdf, original_incidence, nodes_traversed)
+                u_traversed, v_traversed = np.isin(edges_u[candidates], nodes_traversed), np.isin(edges_v[candidates], nodes_traversed)
+                u_clusters = np.isin(edges_clus_u[candidates], clusters) | np.isin(edges_clus_uR[candidates], clusters)
+                v_clusters = np.isin(edges_clus_v[candidates], clusters) | np.isin(edges_clus_vR[candidates], clusters)
+                between = list(edges_index[candidates][((u_traversed | u_clusters) & v_traversed) | (v_clusters & u_traversed)])
 
                 between = list(set(between + lines_traversed + ix_lines)) 
-                to_drop = to_drop + between
-                to_drop = list(filter(lambda a: a != ix_lines[0], to_drop)) 
-                processed = processed + [ix_lines[0]] + to_drop
-                clusters_gdf.at[clusters, 'keep'] =  True
-                if len(original_edges_gdf.loc[processed][original_edges_gdf.pedestrian == 1]) > 0: 
-                    edges_gdf.at[ix_lines[0], 'pedestrian'] = 1
-
-    edges_gdf.drop(to_drop, axis = 0, inplace = True, errors = 'ignore')
+                to_drop.update(between)
+                to_drop.discard(ix_lines[0])
+                processed.add(ix_lines[0])
+                processed.update(to_drop)
+                kept.update(clusters)
+                # only the lines merged in this iteration determine whether the resulting line is pedestrian
+                if not pedestrian.isdisjoint(between): 
+                    pedestrian_lines.add(ix_lines[0])
+
+    clusters_gdf.loc[list(kept), 'keep'] = True
+    edges_gdf.loc[list(pedestrian_lines), 'pedestrian'] = 1
+    edges_gdf.drop(list(to_drop), axis = 0, inplace = True, errors = 'ignore')
     edges_gdf['edgeID'] = edges_gdf.index.values.astype(int)
     nodes_gdf['nodeID'] = nodes_gdf.index.values.astype(int)
     nodes_gdf, edges_gdf = reassign_edges(nodes_gdf, edges_gdf, clusters_gdf)   
@@ -675,75 +592,70 @@ def simplify_dual_lines_nodes_to_cluster(nodes_gdf, edges_gdf, clusters_gdf):
     nodes_gdf, edges_gdf, clusters_gdf = nodes_gdf.copy(), edges_gdf.copy(), clusters_gdf.copy()
     nodes_gdf, edges_gdf, clusters_gdf = _check_indexes(nodes_gdf, edges_gdf, clusters_gdf)
     
-    processed = []
+    processed = set()
     print('Simplifying dual lines: Second part - nodes')
     edges_gdf = _assign_cluster_edges(nodes_gdf, edges_gdf, clusters_gdf)
 
     original_nodes_gdf, original_edges_gdf = nodes_gdf.copy(), edges_gdf.copy()
-    ix_geo = edges_gdf.columns.get_loc("geometry")+1
-    ix_u, ix_v  = edges_gdf.columns.get_loc("u")+1, edges_gdf.columns.get_loc("v")+1
-    ix_name = edges_gdf.columns.get_loc("name")+1
-    ix_cluster = nodes_gdf.columns.get_loc("cluster")+1
-    ix_clus_u, ix_clus_v  = edges_gdf.columns.get_loc("clus_u")+1, edges_gdf.columns.get_loc("clus_v")+1
-    ix_clus_uR, ix_clus_vR = edges_gdf.columns.get_loc("clus_uR")+1, edges_gdf.columns.get_loc("clus_vR")+1
+    original_incidence = _incident_edges(original_edges_gdf)
+    edges_index, edges_u, edges_v = original_edges_gdf.index.values, original_edges_gdf.u.values, original_edges_gdf.v.values
     
     clusters_gdf['keep'] = False
     edges_gdf['new_geo'] = False
-    to_drop = []
+    to_drop = set()
+    kept = set()
+    pedestrian = set(original_edges_gdf.index[original_edges_gdf.pedestrian == 1])
+    pedestrian_lines = set()
     
-    for node in nodes_gdf.itertuples():
-        tmp = original_edges_gdf[((original_edges_gdf.u == node[0]) | (original_edges_gdf.v == node[0]))].copy()
+    # the iterations depend on the lines processed so far and cannot run independently; nodes with a single incident line 
+    # cannot be the shared end of two parallel lines though, and are skipped
+    for node in nodes_gdf.index:
+        if len(original_incidence[node]) < 2:
+            continue
+        tmp = original_edges_gdf.loc[original_incidence[node]]
         
         for road in tmp.itertuples():
             if road.Index in processed: 
                 continue 
-            if road[ix_u] == node[0]:
-                goal = road[ix_clus_v]
-                if goal is None: 
-                    goal = road[ix_clus_vR]
-            elif road[ix_v] == node[0]:
-                goal = road[ix_clus_u]
-                if goal is None: 
-                    goal = road[ix_clus_uR]
-            if goal is None: 
+            if road.u == node:
+                goal = road.clus_v
+                if pd.isna(goal): 
+                    goal = road.clus_vR
+            elif road.v == node:
+                goal = road.clus_u
+                if pd.isna(goal): 
+                    goal = road.clus_uR
+            if pd.isna(goal): 
                 continue
                 
-            possible_dual_lines = tmp[(tmp.clus_u == goal) | (tmp.clus_uR == goal) | (tmp.clus_v == goal) | (tmp.clus_vR == goal)].copy()
+            possible_dual_lines = tmp[_cluster_mask(tmp, goal, ['clus_u', 'clus_uR', 'clus_v', 'clus_vR'])].copy()
             possible_dual_lines['dir'] = 'v'
-            for candidate in possible_dual_lines.itertuples():
-                if candidate[ix_v] == node[0]:
-                    line_coords = list(candidate[ix_geo].coords)
-                    line_coords.reverse() 
-                    new_line_geometry = LineString([coor for coor in line_coords])
-                    old_u, old_clus_u, old_clus_uR = candidate[ix_u], candidate[ix_clus_u], candidate[ix_clus_uR]
-                    possible_dual_lines.at[candidate[0],'geometry'] = new_line_geometry
-                    possible_dual_lines.at[candidate[0],'u'] = candidate[ix_v]
-                    possible_dual_lines.at[candidate[0],'v'] = old_u
-                    possible_dual_lines.at[candidate[0],'clus_u'] = candidate[ix_clus_v]
-                    possible_dual_lines.at[candidate[0],'clus_v'] = old_clus_u
-                    possible_dual_lines.at[candidate[0],'clus_uR'] = candidate[ix_clus_vR]
-                    possible_dual_lines.at[candidate[0],'clus_vR'] = old_clus_uR
-                    possible_dual_lines.at[candidate[0], 'dir'] = 'u' # indicates original dir
+            to_reverse = possible_dual_lines.index[possible_dual_lines.v == node]
+            if len(to_reverse) > 0:
+                reversed_lines = possible_dual_lines.loc[to_reverse]
+                possible_dual_lines.loc[to_reverse, 'geometry'] = gpd.GeoSeries(_reverse_lines(reversed_lines.geometry), index = to_reverse)
+                for column, other_column in [('u', 'v'), ('clus_u', 'clus_v'), ('clus_uR', 'clus_vR')]:
+                    possible_dual_lines.loc[to_reverse, column] = reversed_lines[other_column].values
+                    possible_dual_lines.loc[to_reverse, other_column] = reversed_lines[column].values
+                possible_dual_lines.loc[to_reverse, 'dir'] = 'u' # indicates original dir
                 
-            possible_dual_lines = possible_dual_lines[(possible_dual_lines.clus_v == goal) | (possible_dual_lines.clus_vR == goal)].copy()
+            possible_dual_lines = possible_dual_lines[_cluster_mask(possible_dual_lines, goal, ['clus_v', 'clus_vR'])]
 
             done = False
             if len(possible_dual_lines) == 1: 
                 continue # no parallel streets to road.Index          
             
-            c_u = [possible_dual_lines.iloc[i]['clus_u'] for i in range(0, len(possible_dual_lines))]
-            c_v = [possible_dual_lines.iloc[i]['clus_v'] for i in range(0, len(possible_dual_lines))]
-            u =  [possible_dual_lines.iloc[i]['u'] for i in range(0, len(possible_dual_lines))] 
-            v =  [possible_dual_lines.iloc[i]['v'] for i in range(0, len(possible_dual_lines))] 
-            drs = [possible_dual_lines.iloc[i]['dir'] for i in range(0, len(possible_dual_lines))] 
-            line_geometries = [possible_dual_lines.iloc[i]['geometry'] for i in range(0, len(possible_dual_lines))]       
-            ix_lines = [possible_dual_lines.iloc[i].edgeID for i in range(0, len(possible_dual_lines))]      
+            c_v = possible_dual_lines['clus_v'].tolist()
+            u = possible_dual_lines['u'].tolist()
+            drs = possible_dual_lines['dir'].tolist()
+            line_geometries = list(possible_dual_lines['geometry'].values)
+            ix_lines = possible_dual_lines['edgeID'].tolist()
             list_nodes_traversed = [[] for i in range(0, len(possible_dual_lines))]
             list_lines_traversed = [[] for i in range(0, len(possible_dual_lines))]    
             last_node, nodes_traversed, lines_traversed = None, [], []          
             
             ######################################################## OPTION 1
-            if all(x == c_v[0] for x in c_v) & (not None in c_v):
+            if (not pd.isna(c_v).any()) and all(x == c_v[0] for x in c_v):
                 
                 if len(possible_dual_lines) == 2:
                     merged = dissolve_dual_lines(ix_lines, line_geometries, nodes_gdf, edges_gdf, clusters_gdf, None, goal, u[0], last_node,
@@ -756,26 +668,26 @@ def simplify_dual_lines_nodes_to_cluster(nodes_gdf, edges_gdf, clusters_gdf):
                     continue 
 
                 done = True
-                between = (list(original_edges_gdf.index[(original_edges_gdf.u.isin(nodes_traversed)) & 
-                          (original_edges_gdf.v.isin(nodes_traversed))]))          
+                candidates = _incident_positions(original_edges_gdf, original_incidence, nodes_traversed)
+                between = list(edges_index[candidates][np.isin(edges_u[candidates], nodes_traversed) & 
+                                                       np.isin(edges_v[candidates], nodes_traversed)])          
             
             ######################################################## OPTION 2
-            elif None in c_v:
+            elif pd.isna(c_v).any():
 
                 for n, c in enumerate(c_v):
-                    if c is None:
+                    if pd.isna(c):
                         _, line_geometries[n], list_lines_traversed[n], list_nodes_traversed[n], last_node,_ = indirect_cluster(
-                            original_nodes_gdf, original_edges_gdf, clusters_gdf, ix_lines[n], drs[n])
+                            original_nodes_gdf, original_edges_gdf, clusters_gdf, ix_lines[n], drs[n], incidence = original_incidence)
         
                 nodes_traversed = [item for items in list_nodes_traversed for item in items if item is not None]
                 lines_traversed = [item for items in list_lines_traversed for item in items if item is not None]
                 if len(possible_dual_lines) == 2:
-                    common = list(set(list_lines_traversed[0]).intersection(list_lines_traversed[1]))
-                    if len(common) > 0:
+                    # a pair of lines whose walks share lines is not a dual line
+                    if not set(list_lines_traversed[0]).isdisjoint(list_lines_traversed[1]):
                         continue
-                    else: 
-                        merged = dissolve_dual_lines(ix_lines, line_geometries, nodes_gdf, edges_gdf, clusters_gdf, None, goal, u[0], last_node, 
-                                                    nodes_traversed, drs[0], one_cluster = True)
+                    merged = dissolve_dual_lines(ix_lines, line_geometries, nodes_gdf, edges_gdf, clusters_gdf, None, goal, u[0], last_node, 
+                                                nodes_traversed, drs[0], one_cluster = True)
                 else:
                     merged = dissolve_multiple_dual_lines(ix_lines, line_geometries, nodes_gdf, edges_gdf, clusters_gdf, None, goal, u[0], last_node,
                                                 nodes_traversed, drs[0], one_cluster = True)
@@ -783,19 +695,24 @@ def simplify_dual_lines_nodes_to_cluster(nodes_gdf, edges_gdf, clusters_gdf):
                     continue                  
                     
                 done = True
-                between = (list(original_edges_gdf.index[(original_edges_gdf.u.isin(nodes_traversed)) & 
-                          (original_edges_gdf.v.isin(nodes_traversed))]))
+                candidates = _incident_positions(original_edges_gdf, original_incidence, nodes_traversed)
+                between = list(edges_index[candidates][np.isin(edges_u[candidates], nodes_traversed) & 
+                                                       np.isin(edges_v[candidates], nodes_traversed)])
                 
             if not done: 
                 continue
-            to_drop = to_drop + lines_traversed + ix_lines + between
-            to_drop = list(filter(lambda a: a != ix_lines[0], to_drop))
-            processed = processed + [ix_lines[0]] + to_drop + lines_traversed + between    
-            clusters_gdf.at[goal, 'keep'] = True
-            if len(original_edges_gdf.loc[processed][original_edges_gdf.pedestrian == 1]) > 0:
-                edges_gdf.at[ix_lines[0], 'pedestrian'] = 1
-
-    edges_gdf.drop(to_drop, axis = 0, inplace = True, errors = 'ignore')
+            to_drop.update(lines_traversed, ix_lines, between)
+            to_drop.discard(ix_lines[0])
+            processed.add(ix_lines[0])
+            processed.update(to_drop, lines_traversed, between)
+            kept.add(goal)
+            # only the lines merged in this iteration determine whether the resulting line is pedestrian
+            if not pedestrian.isdisjoint(set(ix_lines).union(lines_traversed, between)):
+                pedestrian_lines.add(ix_lines[0])
+
+    clusters_gdf.loc[list(kept), 'keep'] = True
+    edges_gdf.loc[list(pedestrian_lines), 'pedestrian'] = 1
+    edges_gdf.drop(list(to_drop), axis = 0, inplace = True, errors = 'ignore')
     nodes_gdf, edges_gdf = reassign_edges(nodes_gdf, edges_gdf, clusters_gdf)            
     edges_gdf['edgeID'] = edges_gdf.index.values.astype(int)
     nodes_gdf['nodeID'] = nodes_gdf.index.values.astype(int)
@@ -808,70 +725,22 @@ def reassign_edges(nodes_gdf, edges_gdf, clusters_gdf):
     nodes_gdf, edges_gdf = nodes_gdf.copy(), edges_gdf.copy()
     edges_gdf = edges_gdf.rename(columns = {'u':'old_u', 'v':'old_v'})
     
-    edges_gdf['u'], edges_gdf['v'] = 0, 0
-    ix_u, ix_v = edges_gdf.columns.get_loc("u")+1, edges_gdf.columns.get_loc("v")+1 
-    ix_old_u, ix_old_v = edges_gdf.columns.get_loc("old_u")+1, edges_gdf.columns.get_loc("old_v")+1 
-    ix_geo = edges_gdf.columns.get_loc("geometry")+1 
-    ix_changed = edges_gdf.columns.get_loc("new_geo")+1 
-    ix_cluster = nodes_gdf.columns.get_loc("cluster")+1 
-    ix_x, ix_y = clusters_gdf.columns.get_loc("x")+1, clusters_gdf.columns.get_loc("y")+1
-    ix_centroid = clusters_gdf.columns.get_loc("geometry")+1
-    ix_check = clusters_gdf.columns.get_loc("keep")+1
-    
-    for row in edges_gdf.itertuples():
-        
-        line_coords = list(row[ix_geo].coords)
-        u = nodes_gdf.loc[row[ix_old_u]]["cluster"]
-        v = nodes_gdf.loc[row[ix_old_v]]["cluster"]
-        old_u = row[ix_old_u]
-        old_v = row[ix_old_v]
-        new_geo = row[ix_changed]
-        
-        if (u is not None) & (v is not None):  # change starting and ending node in the list of coordinates for the line
-            if (not clusters_gdf.loc[u].keep) & (not clusters_gdf.loc[v].keep): 
-                u = old_u
-                v = old_v
-            elif not clusters_gdf.loc[v].keep:
-                v = old_v
-                line_coords[0] = (clusters_gdf.loc[u]['x'], clusters_gdf.loc[u]['y'])
-                # if not new_geo: line_coords.insert(1,nodes_gdf.loc[row[ix_old_u]]['geometry'].coords[0]) 
-            elif not clusters_gdf.loc[u].keep:
-                u = old_u    
-                line_coords[-1] = (clusters_gdf.loc[v]['x'], clusters_gdf.loc[v]['y'])
-                # if not new_geo: line_coords.insert(-1,nodes_gdf.loc[row[ix_old_v]]['geometry'].coords[0]) 
-            else:
-                line_coords[0] = (clusters_gdf.loc[u]['x'], clusters_gdf.loc[u]['y'])
-                line_coords[-1] = (clusters_gdf.loc[v]['x'], clusters_gdf.loc[v]['y'])
-                # if not new_geo:
-                    # line_coords.insert(1,nodes_gdf.loc[row[ix_old_u]]['geometry'].coords[0]) 
-                    # line_coords.insert(-1,nodes_gdf.loc[row[ix_old_v]]['geometry'].coords[0]) 
-
-        elif (u is None) & (v is None):  # maintain old_u and old_v
-            u = old_u
-            v = old_v
-        elif (u is None) & (v is not None): # maintain old_u
-            u = old_u
-            if not clusters_gdf.loc[v].keep: 
-                v = old_v
-            else: 
-                line_coords[-1] = (clusters_gdf.loc[v]['x'], clusters_gdf.loc[v]['y'])
-                # if not new_geo: line_coords.insert(-1,nodes_gdf.loc[row[ix_old_v]]['geometry'].coords[0]) 
-        elif (u is not None) & (v is None): # maintain old_v
-            v = old_v
-            if not clusters_gdf.loc[u].keep: 
-                u = old_u
-            else: 
-                line_coords[0] = (clusters_gdf.loc[u]['x'], clusters_gdf.loc[u]['y'])
-                # if not new_geo: line_coords.insert(1,nodes_gdf.loc[row[ix_old_u]]['geometry'].coords[0]) 
-        
-        line_geometry = (LineString([coor for coor in line_coords]))
-        if u == v: 
-            edges_gdf.drop(row.Index, axis = 0, inplace = True)
-            continue
-        
-        edges_gdf.at[row.Index,"u"] = u
-        edges_gdf.at[row.Index,"v"] = v
-        edges_gdf.at[row.Index,"geometry"] = line_geometry
+    # the nodes of an edge are replaced by their clusters, when these are kept
+    u_clusters = nodes_gdf['cluster'].reindex(edges_gdf['old_u'].values)
+    v_clusters = nodes_gdf['cluster'].reindex(edges_gdf['old_v'].values)
+    keep_u = u_clusters.map(clusters_gdf['keep']).fillna(False).to_numpy(dtype = bool)
+    keep_v = v_clusters.map(clusters_gdf['keep']).fillna(False).to_numpy(dtype = bool)
+    edges_gdf['u'] = np.where(keep_u, u_clusters.to_numpy(dtype = 'int64', na_value = -1), edges_gdf['old_u'].values)
+    edges_gdf['v'] = np.where(keep_v, v_clusters.to_numpy(dtype = 'int64', na_value = -1), edges_gdf['old_v'].values)
+    
+    # change starting and/or ending node in the list of coordinates for the lines
+    clusters_xy = clusters_gdf[['x', 'y']].astype(float)
+    new_start = np.where(keep_u[:, None], clusters_xy.reindex(edges_gdf['u'].values).values, np.nan)
+    new_end = np.where(keep_v[:, None], clusters_xy.reindex(edges_gdf['v'].values).values, np.nan)
+    edges_gdf['geometry'] = _replace_endpoints(edges_gdf.geometry, new_start, new_end)
+    
+    # edges whose nodes now belong to the same cluster are self-loops
+    edges_gdf.drop(edges_gdf.index[edges_gdf.u == edges_gdf.v], axis = 0, inplace = True)
 
     edges_gdf.drop(['old_u', 'old_v'], axis = 1, inplace=True)
     edges_gdf['u'] = edges_gdf['u'].astype(int)
@@ -879,26 +748,388 @@ def reassign_edges(nodes_gdf, edges_gdf, clusters_gdf):
     nodes_gdf['x'] = nodes_gdf['x'].astype(float)
     nodes_gdf['y'] = nodes_gdf['y'].astype(float)
        
-    for cluster in clusters_gdf.itertuples():
-        if not cluster[ix_check]:
-            continue
-               
-        nodes_gdf.at[cluster.Index, 'x'] = cluster[ix_x]
-        nodes_gdf.at[cluster.Index, 'y'] = cluster[ix_y]
-        nodes_gdf.at[cluster.Index, 'geometry'] = cluster[ix_centroid]
-        nodes_gdf.at[cluster.Index, 'nodeID'] = cluster.Index
-        nodes_gdf.at[cluster.Index, 'cluster'] = None
+    # the kept clusters become nodes, new rows are appended for the ones that are not nodes yet
+    kept_clusters = clusters_gdf[clusters_gdf['keep']]
+    new_nodes = kept_clusters.index[~kept_clusters.index.isin(nodes_gdf.index)]
+    nodes_gdf = nodes_gdf.reindex(nodes_gdf.index.append(new_nodes))
+    nodes_gdf.loc[kept_clusters.index, 'x'] = kept_clusters['x'].values
+    nodes_gdf.loc[kept_clusters.index, 'y'] = kept_clusters['y'].values
+    nodes_gdf.loc[kept_clusters.index, 'geometry'] = kept_clusters.geometry.values
+    nodes_gdf.loc[kept_clusters.index, 'nodeID'] = kept_clusters.index.values
+    nodes_gdf.loc[kept_clusters.index, 'cluster'] = pd.NA
     
     clusters_gdf.index = clusters_gdf.clusterID.astype(int)
     nodes_gdf['nodeID'] = nodes_gdf.nodeID.astype(int)
     nodes_gdf.index = nodes_gdf.nodeID
     nodes_gdf.index.name = None
-    edges_gdf.drop(['clus_u','clus_v', 'clus_uR', 'clus_vR', 'new_geo', 'forced_cluster'], axis = 1, errors = 'ignore', inplace = True)
+    edges_gdf.drop(['clus_u','clus_v', 'clus_uR', 'clus_vR', 'new_geo', 'forced_cluster', 'x_start', 'y_start', 'x_end', 'y_end'], axis = 1, 
+                    errors = 'ignore', inplace = True)
     edges_gdf = correct_edges(nodes_gdf, edges_gdf)
     nodes_gdf, edges_gdf = clean_network(nodes_gdf, edges_gdf, dead_ends = True, remove_disconnected_islands = False, same_uv_edges = True, self_loops = True)
     return(nodes_gdf, edges_gdf)
 
 
+def _incident_edges(edges_gdf, from_column = 'u', to_column = 'v'):
+    """
+    It maps each node to the indexes of the edges that are incident to it.
+    
+    Parameters
+    ----------
+    edges_gdf: LineString GeoDataFrame
+        street segments GeoDataFrame
+    from_column, to_column: string
+        the columns containing the edges' end-points (e.g. 'clus_u' and 'clus_v', to map clusters); missing values are ignored
+    
+    Returns:
+    ----------
+    incidence: dict
+        the indexes of the incident edges (list), per node
+    """
+    
+    incidence = defaultdict(list)
+    for ix_line, u, v in zip(edges_gdf.index, edges_gdf[from_column], edges_gdf[to_column]):
+        if pd.notna(u):
+            incidence[u].append(ix_line)
+        if pd.notna(v) and ((pd.isna(u)) or (v != u)):
+            incidence[v].append(ix_line)
+    return incidence
+
+def _cluster_mask(edges_gdf, cluster, columns):
+    """
+    It flags the edges that reach a certain cluster in at least one of the given columns; missing values never match.
+    
+    Parameters
+    ----------
+    edges_gdf: LineString GeoDataFrame
+        street segments GeoDataFrame
+    cluster: int
+        the clusterID
+    columns: list of string
+        the Int64 columns to check (e.g. 'clus_u', 'clus_v', 'clus_uR', 'clus_vR')
+    
+    Returns:
+    ----------
+    mask: ndarray
+        boolean array, one value per edge
+    """
+    
+    # the comparison on plain integer arrays avoids the masked (nullable) comparison path
+    return np.logical_or.reduce([edges_gdf[column].to_numpy(dtype = 'int64', na_value = -1) == cluster for column in columns])
+
+def _incident_positions(edges_gdf, incidence, nodes):
+    """
+    It returns the positions, in the GeoDataFrame, of the edges that are incident to at least one of the given nodes.
+    
+    Parameters
+    ----------
+    edges_gdf: LineString GeoDataFrame
+        street segments GeoDataFrame
+    incidence: dict
+        the indexes of the incident edges, per node, as returned by _incident_edges
+    nodes: list
+        the nodeIDs
+    
+    Returns:
+    ----------
+    positions: ndarray
+        the integer positions of the edges
+    """
+    
+    incident = {ix_line for node in nodes for ix_line in incidence.get(node, [])}
+    return edges_gdf.index.get_indexer(list(incident))
+
+def _lines_endpoints(line_geometries):
+    """
+    It extracts the coordinates of the first and the last vertex of a sequence of LineStrings.
+    
+    Parameters
+    ----------
+    line_geometries: list of LineString
+        the lines
+    
+    Returns:
+    ----------
+    start, end: tuple of ndarray
+        two (n, 2) arrays with the coordinates of the first and of the last vertex of each line
+    """
+    
+    if _HAS_SHAPELY2:
+        line_geometries = _geometry_array(line_geometries)
+        return (shapely.get_coordinates(shapely.get_point(line_geometries, 0)), shapely.get_coordinates(shapely.get_point(line_geometries, -1)))
+    
+    # (0, 2) arrays when there are no lines; only x and y are kept, as in shapely.get_coordinates
+    start = np.array([line.coords[0][:2] for line in line_geometries], dtype = float).reshape(-1, 2)
+    end = np.array([line.coords[-1][:2] for line in line_geometries], dtype = float).reshape(-1, 2)
+    return start, end
+
+def _lines_lengths(line_geometries):
+    """
+    It computes the lengths of a sequence of LineStrings.
+    
+    Parameters
+    ----------
+    line_geometries: list of LineString
+        the lines
+    
+    Returns:
+    ----------
+    lengths: ndarray
+        the lengths of the lines
+    """
+    
+    if _HAS_SHAPELY2:
+        return shapely.length(_geometry_array(line_geometries))
+    return np.array([line.length for line in line_geometries], dtype = float)
+
+def _lines_midpoints(line_geometries):
+    """
+    It extracts the coordinates of the points placed halfway along a sequence of LineStrings.
+    
+    Parameters
+    ----------
+    line_geometries: list of LineString
+        the lines
+    
+    Returns:
+    ----------
+    mid_points: ndarray
+        (n, 2) array with the coordinates of the mid-point of each line
+    """
+    
+    if _HAS_SHAPELY2:
+        return shapely.get_coordinates(shapely.line_interpolate_point(_geometry_array(line_geometries), 0.5, normalized = True))
+    return np.array([line.interpolate(0.5, normalized = True).coords[0] for line in line_geometries], dtype = float)
+
+def _geometry_array(geometries):
+    """
+    It converts a sequence of geometries (list, GeoSeries) into a numpy array of geometries, as taken by the Shapely 2.0 vectorized functions.
+    
+    Parameters
+    ----------
+    geometries: list of shapely geometries, GeoSeries
+        the geometries
+    
+    Returns:
+    ----------
+    geometries: ndarray
+        the geometries, in a one-dimensional object array
+    """
+    
+    geometry_array = np.empty(len(geometries), dtype = object)
+    geometry_array[:] = list(geometries)
+    return geometry_array
+
+def _endpoint_dist(points, other_points):
+    """
+    It computes the euclidean distances between pairs of points, given their coordinates.
+    
+    Parameters
+    ----------
+    points, other_points: numpy.ndarray
+        the coordinates of the points, (2,) or (n, 2) arrays
+    
+    Returns:
+    ----------
+    distances: float or numpy.ndarray
+        the distances between the points
+    """
+    
+    delta = np.asarray(points, dtype = float) - np.asarray(other_points, dtype = float)
+    return np.hypot(delta[..., 0], delta[..., 1])
+
+def _deflection_angles(line_start, line_end, starts, ends):
+    """
+    It computes the deflection angle, in degrees, between a LineString and a set of LineStrings that share a vertex with it. 
+    As in angle_line_geometries (with deflection = True) only the first and the last vertexes of the lines are considered.
+    
+    Parameters
+    ----------
+    line_start, line_end: ndarray
+        the coordinates of the first and of the last vertex of the line
+    starts, ends: ndarray
+        (n, 2) arrays with the coordinates of the first and of the last vertex of the other lines
+    
+    Returns:
+    ----------
+    angles: ndarray
+        the resulting angles in degrees
+    """
+    
+    end_end = (ends == line_end).all(axis = 1)
+    end_start = (starts == line_end).all(axis = 1) & ~end_end
+    start_start = (starts == line_start).all(axis = 1) & ~(end_end | end_start)
+    
+    # vectors pointing away from the common vertex along the line, and towards it along the other lines
+    vA = np.where((end_end | end_start)[:, None], line_start - line_end, line_end - line_start)
+    vB = np.where((end_start | start_start)[:, None], starts - ends, ends - starts)
+    
+    dot_prod = vA[:, 0]*vB[:, 0] + vA[:, 1]*vB[:, 1]
+    magA = (vA[:, 0]*vA[:, 0] + vA[:, 1]*vA[:, 1])**0.5
+    magB = (vB[:, 0]*vB[:, 0] + vB[:, 1]*vB[:, 1])**0.5
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        angles = np.degrees(np.arccos(dot_prod/magB/magA))
+    # degenerate lines
+    angles[np.isnan(angles)] = 0.0
+    return angles
+
+def _longer_coincident_lines(line_geometries):
+    """
+    It identifies the lines to discard when lines share an end-point: pair by pair, in order, the longer line of the pair is discarded.
+    Pairs of lines with the same length, or involving an already discarded line, are ignored.
+    
+    Parameters
+    ----------
+    line_geometries: list of LineString
+        the lines
+    
+    Returns:
+    ----------
+    to_remove: set
+        the positions of the lines to discard, in line_geometries
+    """
+    
+    start, end = _lines_endpoints(line_geometries)
+    lengths = _lines_lengths(line_geometries)
+    lines_by_endpoint = defaultdict(set)
+    for n in range(len(line_geometries)):
+        lines_by_endpoint[tuple(start[n])].add(n)
+        lines_by_endpoint[tuple(end[n])].add(n)
+    pairs = sorted({(n, nn) for lines in lines_by_endpoint.values() for n in lines for nn in lines if n < nn})
+    
+    to_remove = set()
+    for n, nn in pairs:
+        if (n in to_remove) or (nn in to_remove):
+            continue
+        if lengths[n] > lengths[nn]: 
+            to_remove.add(n)
+        elif lengths[n] < lengths[nn]: 
+            to_remove.add(nn)
+    return to_remove
+
+def _is_possible_dual_batch(ix_lineA, edges_gdf, processed):
+    """
+    It checks, at once, which of the edges are possible dual lines of the edge ix_lineA, as is_possible_dual does (one_cluster = False): 
+    the edges must not be processed, must not share a node with ix_lineA and must be parallel to it (is_parallel, hard = True).
+    
+    Parameters
+    ----------
+    ix_lineA: int
+        the index of the edge
+    edges_gdf: LineString GeoDataFrame
+        the edges to check, including ix_lineA; the rounded end-points coordinates are in the x_start, y_start, x_end, y_end columns
+    processed: set
+        the indexes of the processed edges
+    
+    Returns:
+    ----------
+    candidates: numpy.ndarray
+        boolean array, True for the possible dual lines
+    """
+    
+    ix_A = edges_gdf.index.get_loc(ix_lineA)
+    us, vs = edges_gdf.u.to_numpy(), edges_gdf.v.to_numpy()
+    shared_node = (us == us[ix_A]) | (us == vs[ix_A]) | (vs == us[ix_A]) | (vs == vs[ix_A])
+    angles = _y_axis_angles(edges_gdf[['x_start', 'y_start']].values.astype(float), edges_gdf[['x_end', 'y_end']].values.astype(float))
+    parallel = np.abs(angles - angles[ix_A]) <= 30
+    
+    return (~edges_gdf.index.isin(processed)) & (~shared_node) & parallel
+
+def _y_axis_angles(starts, ends):
+    """
+    It computes the angles, in degrees in [0, 180], that the lines form with the Y-axis, as difference_angle_line_geometries does.
+    
+    Parameters
+    ----------
+    starts, ends: numpy.ndarray
+        (n, 2) arrays with the coordinates of the first and last vertexes of the lines
+    
+    Returns:
+    ----------
+    angles: numpy.ndarray
+        the angles
+    """
+    
+    dx, dy = ends[:, 0] - starts[:, 0], ends[:, 1] - starts[:, 1]
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        angles = np.degrees(np.where(dx == 0, np.pi/2, np.arctan(dy/dx))) % 360
+    return np.where(angles > 180, angles - 180, angles)
+
+def _replace_endpoints(line_geometries, new_start, new_end):
+    """
+    It replaces the first and/or the last vertex of a sequence of LineStrings.
+    
+    Parameters
+    ----------
+    line_geometries: list of LineString, GeoSeries
+        the lines
+    new_start, new_end: ndarray
+        (n, 2) arrays with the coordinates of the new first and last vertexes; the vertexes of the rows containing NaN are not replaced
+    
+    Returns:
+    ----------
+    line_geometries: list or ndarray of LineString
+        the resulting lines
+    """
+    
+    replace_start, replace_end = ~np.isnan(new_start[:, 0]), ~np.isnan(new_end[:, 0])
+    if _HAS_SHAPELY2:
+        # coordinates of all the lines in one array, the position of the first and last vertex of each line is derived from the line index
+        coords, index = shapely.get_coordinates(_geometry_array(line_geometries), return_index = True)
+        first = np.searchsorted(index, np.arange(len(line_geometries)))
+        last = np.r_[first[1:], len(coords)] - 1
+        coords[first[replace_start]] = new_start[replace_start]
+        coords[last[replace_end]] = new_end[replace_end]
+        return shapely.linestrings(coords, indices = index)
+    
+    new_lines = []
+    for n, line in enumerate(line_geometries):
+        if not (replace_start[n] or replace_end[n]):
+            new_lines.append(line)
+            continue
+        line_coords = list(line.coords)
+        if replace_start[n]:
+            line_coords[0] = tuple(new_start[n])
+        if replace_end[n]:
+            line_coords[-1] = tuple(new_end[n])
+        new_lines.append(LineString(line_coords))
+    return new_lines
+
+def _reverse_lines(line_geometries):
+    """
+    It reverses the order of the vertexes of a sequence of LineStrings.
+    
+    Parameters
+    ----------
+    line_geometries: list of LineString
+        the lines
+    
+    Returns:
+    ----------
+    reversed_lines: list of LineString
+        the reversed lines
+    """
+    
+    if _HAS_SHAPELY2:
+        return list(shapely.reverse(_geometry_array(line_geometries)))
+    return [LineString(line.coords[::-1]) for line in line_geometries]
+
+def _distance_matrix(coords):
+    """
+    It computes the euclidean distance between each pair of points in a (n, 2) array of coordinates.
+    
+    Parameters
+    ----------
+    coords: ndarray
+        the coordinates of the points
+    
+    Returns:
+    ----------
+    distances: ndarray
+        the (n, n) matrix of distances
+    """
+    
+    return np.linalg.norm(coords[:, None, :] - coords[None, :, :], axis = -1)
+
 def _check_indexes(nodes_gdf, edges_gdf, clusters_gdf):    
      
     nodes_gdf.index, edges_gdf.index, clusters_gdf.index = nodes_gdf.nodeID, edges_gdf.edgeID, clusters_gdf.clusterID
@@ -921,6 +1152,33 @@ def simplify_pipeline(nodes_gdf, edges_gdf, radius = 12):
     nodes_gdf, edges_gdf = simplify_complex_junctions(nodes_gdf, edges_gdf)
     
     return nodes_gdf, edges_gdf
+
+def simplify_pipeline_batch(graphs, n_jobs = -1, radius = 12):
+    """
+    It runs the simplification pipeline on several street networks (e.g. the tiles of a city) in parallel processes.
+    The networks are simplified independently; each worker runs simplify_pipeline on one network at a time.
+    
+    Parameters
+    ----------
+    graphs: list of tuple
+        the (nodes_gdf, edges_gdf) pairs of GeoDataFrames to simplify
+    n_jobs: int
+        the number of worker processes; -1 uses all the available CPUs
+    radius: float
+        the radius used to identify clusters of nodes (see identify_clusters)
+    
+    Returns:
+    ----------
+    simplified: list of tuple
+        the simplified (nodes_gdf, edges_gdf) pairs, in the same order as the input
+    """
+    
+    if n_jobs == -1: 
+        n_jobs = os.cpu_count()
+    nodes, edges = [graph[0] for graph in graphs], [graph[1] for graph in graphs]
+    with ProcessPoolExecutor(max_workers = n_jobs) as executor:
+        simplified = list(executor.map(simplify_pipeline, nodes, edges, [radius]*len(nodes)))
+    return simplified
     
           
          
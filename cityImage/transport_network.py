@@ -102,7 +102,7 @@ def gdfs_from_railways(railways_gdf, epsg):
     edges_gdf['code'], edges_gdf['coords'] = None, None
 
     # remove z coordinates, if any
-    edges_gdf["geometry"] = edges_gdf.apply(lambda row: LineString([coor for coor in [row["geometry"].coords[i][0:2] for i in range(0, len(row["geometry"].coords))]]), axis = 1)
+    edges_gdf["geometry"] = edges_gdf.apply(lambda row: LineString([row["geometry"].coords[i][0:2] for i in range(0, len(row["geometry"].coords))]), axis = 1)
     
     # assigning indexes
     nodes_gdf = obtain_nodes_gdf(edges_gdf, crs)
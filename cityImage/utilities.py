@@ -76,7 +76,7 @@ def center_line(line_geometryA, line_geometryB):
             
     cl_coords[0] = line_coordsA[0]
     cl_coords[-1] = line_coordsA[-1]
-    center_line = LineString([coor for coor in cl_coords])
+    center_line = LineString(cl_coords)
 
     return center_line
 
@@ -116,7 +116,7 @@ def center_line_coords(line_geometryA, line_geometryB):
         
         center_line_coords = line_coordsA
         for n, i in enumerate(line_coordsA):
-            link = LineString([coor for coor in [line_coordsA[n], line_coordsB[n]]])
+            link = LineString([line_coordsA[n], line_coordsB[n]])
             np = link.centroid.coords[0]           
             center_line_coords[n] = np
     
@@ -151,8 +151,8 @@ def split_line_at_interpolation(point, line_geometry):
     if len(line_coords) == 2:
         new_line_A = [line_coords[0],  np.coords[0]]
         new_line_B = [np.coords[0], line_coords[-1]]
-        line_geometry_A = LineString([coor for coor in new_line_A])
-        line_geometry_B = LineString([coor for coor in new_line_B])
+        line_geometry_A = LineString(new_line_A)
+        line_geometry_B = LineString(new_line_B)
 
     else:
         new_line_A.append(line_coords[0])
@@ -167,8 +167,8 @@ def split_line_at_interpolation(point, line_geometry):
 
         new_line_A.append(np.coords[0])
         new_line_B.append(line_coords[-1])
-        line_geometry_A = LineString([coor for coor in new_line_A])
-        line_geometry_B = LineString([coor for coor in new_line_B])
+        line_geometry_A = LineString(new_line_A)
+        line_geometry_B = LineString(new_line_B)
     
     result = ((line_geometry_A, line_geometry_B), np)    
     return result
@@ -241,7 +241,7 @@ def merge_lines(line_geometries):
             
     if reverse:
         coords.reverse()
-    newLine = LineString([coor for coor in coords])
+    newLine = LineString(coords)
     return newLine
             
 def envelope_wgs(gdf):